@@ -4,6 +4,8 @@ Berlin Appointment Scraper
 Checks for available appointments for the Einbürgerungstest (citizenship test)
 """
 
+import logging
+import re
 import time
 import requests
 from selenium import webdriver
@@ -15,13 +17,41 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webdriver_manager.chrome import ChromeDriverManager
 
+from config import SESSION_CONFIG
+from logging_config import setup_logging
+from session_store import SessionStore, apply_cookies_to_requests, selenium_to_cdp_cookie
+
+logger = logging.getLogger("berlin_appointment_scraper")
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+NO_APPOINTMENTS_TEXT = "Leider sind aktuell keine Termine für ihre Auswahl verfügbar."
+BOOKABLE_CLASS = "buchbar"  # bookable day in the portal calendar ("nichtbuchbar" is not)
+CALENDAR_CLASSES = frozenset({"calendar-month-table", "buchbar", "nichtbuchbar"})
+_CLASS_ATTRIBUTE = re.compile(r"""class\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+
+
+def page_classes(page_source):
+    """Set of CSS class tokens used on a page"""
+    return {
+        token
+        for match in _CLASS_ATTRIBUTE.finditer(page_source)
+        for token in (match.group(1) or match.group(2) or "").split()
+    }
+
 
 class BerlinAppointmentScraper:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, session_store=None, url=None, debugging_port=9222):
         """Initialize the scraper with Chrome options"""
-        self.url = "https://service.berlin.de/dienstleistung/351180/"
+        self.url = url or "https://service.berlin.de/dienstleistung/351180/"
         self.driver = None
         self.headless = headless
+        # None lets chromedriver pick a free port (needed for concurrent browsers)
+        self.debugging_port = debugging_port
+        if session_store is None and SESSION_CONFIG["enabled"]:
+            session_store = SessionStore()
+        self.session_store = session_store
+        self.http_fast_path = SESSION_CONFIG["http_fast_path"]
+        self.http_session = None
         
     def setup_driver(self):
         """Setup Chrome driver with appropriate options"""
@@ -32,7 +62,7 @@ class BerlinAppointmentScraper:
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+        chrome_options.add_argument(f"--user-agent={USER_AGENT}")
         
         # Additional options for server/headless environments
         chrome_options.add_argument("--disable-extensions")
@@ -43,7 +73,8 @@ class BerlinAppointmentScraper:
         chrome_options.add_argument("--disable-background-timer-throttling")
         chrome_options.add_argument("--disable-renderer-backgrounding")
         chrome_options.add_argument("--disable-backgrounding-occluded-windows")
-        chrome_options.add_argument("--remote-debugging-port=9222")
+        if self.debugging_port is not None:
+            chrome_options.add_argument(f"--remote-debugging-port={self.debugging_port}")
         
         # Set Chrome binary path for different systems
         import platform
@@ -68,8 +99,8 @@ class BerlinAppointmentScraper:
             service = Service(ChromeDriverManager().install())
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
         except Exception as e:
-            print(f"❌ Error setting up ChromeDriver: {e}")
-            print("🔧 Trying alternative ChromeDriver setup...")
+            logger.warning("❌ Error setting up ChromeDriver: %s", e)
+            logger.info("🔧 Trying alternative ChromeDriver setup...")
             # Try without webdriver manager
             self.driver = webdriver.Chrome(options=chrome_options)
         
@@ -90,28 +121,133 @@ class BerlinAppointmentScraper:
         # try:
         #     response = requests.post(notification_url, json=payload, timeout=10)
         #     if response.status_code == 200:
-        #         print(f"✅ Notification sent successfully: {message}")
+        #         logger.info("✅ Notification sent successfully: %s", message)
         #     else:
-        #         print(f"❌ Failed to send notification. Status code: {response.status_code}")
+        #         logger.error("❌ Failed to send notification. Status code: %s", response.status_code)
         # except requests.RequestException as e:
-        #     print(f"❌ Error sending notification: {e}")
+        #     logger.error("❌ Error sending notification: %s", e)
         
-        # For now, just print the message
-        print(f"🔔 NOTIFICATION: {message}")
+        # For now, just log the message
+        logger.warning("🔔 NOTIFICATION: %s", message)
         
+    def _no_appointments_on_page(self, page_source):
+        """Check for the "no appointments available" message"""
+        return NO_APPOINTMENTS_TEXT.lower() in page_source.lower()
+
+    def _slots_maybe_on_page(self, page_source):
+        """Check for a calendar day marked bookable"""
+        return BOOKABLE_CLASS in page_classes(page_source)
+
+    def _result_page_recognised(self, page_source):
+        """Is this a real result: the no-appointments message or a calendar"""
+        return (self._no_appointments_on_page(page_source)
+                or bool(CALENDAR_CLASSES & page_classes(page_source)))
+
+    def _form_query_url(self, submit_button):
+        """URL of the availability query the form submits (re-runs it on every GET)"""
+        try:
+            form = submit_button.find_element(By.XPATH, "./ancestor::form")
+            return form.get_attribute("action")
+        except Exception as e:
+            logger.debug("ℹ️ Could not read the form action: %s", e)
+            return None
+
+    def _save_session(self, query_url):
+        """
+        Remember the query URL and cookies so the next check can skip the form
+        Never the page the submit ended on: that can be a fixed "no appointments" page.
+        """
+        if not (self.session_store and query_url):
+            return
+        if not self._result_page_recognised(self.driver.page_source):
+            logger.debug("ℹ️ Unrecognised page after submit, not saving the session")
+            return
+        self.session_store.save(query_url, self.driver.get_cookies(), self.url)
+
+    def check_saved_session_browser(self):
+        """
+        Warm start: re-run the saved availability query with the saved cookies
+        Returns True only if the page confirms there are no appointments
+        """
+        session = self.session_store.load(self.url) if self.session_store else None
+        if not session:
+            return False
+
+        logger.info("♻️ Reusing saved session: %s", session["query_url"])
+        try:
+            for cookie in session["cookies"]:
+                self.driver.execute_cdp_cmd("Network.setCookie", selenium_to_cdp_cookie(cookie))
+            self.driver.get(session["query_url"])
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.TAG_NAME, "body"))
+            )
+            if self._no_appointments_on_page(self.driver.page_source):
+                return True
+        except Exception as e:
+            logger.warning("⚠️ Saved session check failed: %s", e)
+
+        # Expired session or something worth a closer look: redo the full form flow
+        logger.info("🔁 Saved session not usable, redoing the form")
+        self.session_store.invalidate()
+        return False
+
+    def get_http_session(self):
+        """Return the reusable requests session (keeps connections alive between checks)"""
+        if self.http_session is None:
+            self.http_session = requests.Session()
+            self.http_session.headers["User-Agent"] = USER_AGENT
+        return self.http_session
+
+    def check_saved_session_http(self):
+        """
+        Warm start without a browser: re-run the saved availability query with requests
+        Returns True only if the page confirms there are no appointments
+        """
+        if not (self.session_store and self.http_fast_path):
+            return False
+        session = self.session_store.load(self.url)
+        if not session:
+            return False
+
+        http_session = self.get_http_session()
+        apply_cookies_to_requests(http_session, session["cookies"])
+
+        try:
+            response = http_session.get(session["query_url"], timeout=10)
+        except requests.RequestException as e:
+            logger.warning("⚠️ Saved session request failed: %s", e)
+            return False
+
+        if not response.ok:
+            return False
+        if self._no_appointments_on_page(response.text):
+            logger.info("❌ No appointments available (saved session, no browser)")
+            return True
+        if not self._slots_maybe_on_page(response.text):
+            # Expired session, captcha or similar: no point in reopening it in Chrome
+            logger.info("🔁 Saved session not usable, redoing the form")
+            self.session_store.invalidate()
+        # Possible slots: let the browser take a fresh look
+        return False
+
     def check_appointments(self):
         """
         Main function to check for available appointments
         Returns True if appointments are available, False otherwise
         """
         try:
-            print("🚀 Starting Berlin appointment check...")
+            logger.info("🚀 Starting Berlin appointment check...")
             
             # Setup driver
             self.setup_driver()
             
+            # Skip the form while the saved session is still valid
+            if self.check_saved_session_browser():
+                logger.info("❌ No appointments available")
+                return False
+            
             # Navigate to the page
-            print(f"📱 Navigating to: {self.url}")
+            logger.info("📱 Navigating to: %s", self.url)
             self.driver.get(self.url)
             
             # Wait for page to load
@@ -120,14 +256,14 @@ class BerlinAppointmentScraper:
             )
             
             # Find and click the "Alle Standorte auswählen" checkbox
-            print("🔍 Looking for 'Alle Standorte auswählen' checkbox...")
+            logger.debug("🔍 Looking for 'Alle Standorte auswählen' checkbox...")
             
             checkbox = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.ID, "checkbox_overall"))
             )
             
             if not checkbox.is_selected():
-                print("✅ Selecting 'Alle Standorte auswählen' checkbox...")
+                logger.info("✅ Selecting 'Alle Standorte auswählen' checkbox...")
                 # Scroll to the element to ensure it's visible
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", checkbox)
                 time.sleep(0.5)  # Small delay after scrolling
@@ -136,82 +272,84 @@ class BerlinAppointmentScraper:
                 try:
                     self.driver.execute_script("arguments[0].click();", checkbox)
                 except Exception as e:
-                    print(f"⚠️ JavaScript click failed, trying regular click: {e}")
+                    logger.warning("⚠️ JavaScript click failed, trying regular click: %s", e)
                     checkbox.click()
                 
                 time.sleep(1)  # Small delay to ensure the checkbox is selected
             else:
-                print("ℹ️ Checkbox already selected")
+                logger.debug("ℹ️ Checkbox already selected")
             
             # Find and click the submit button
-            print("🔍 Looking for submit button...")
+            logger.debug("🔍 Looking for submit button...")
             
             submit_button = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.ID, "appointment_submit"))
             )
             
-            print("🔄 Clicking submit button...")
+            query_url = self._form_query_url(submit_button)
+            
+            logger.info("🔄 Clicking submit button...")
             submit_button.click()
             
             # Wait for the new page to load
-            print("⏳ Waiting for results page to load...")
+            logger.debug("⏳ Waiting for results page to load...")
             time.sleep(3)  # Give the page time to load
             
-            # Check for the "no appointments available" message
-            no_appointments_text = "Leider sind aktuell keine Termine für ihre Auswahl verfügbar."
-            
-            page_source = self.driver.page_source.lower()
-            no_appointments_found = no_appointments_text.lower() in page_source
+            self._save_session(query_url)
             
-            if no_appointments_found:
-                print("❌ No appointments available")
+            if self._no_appointments_on_page(self.driver.page_source):
+                logger.info("❌ No appointments available")
                 return False
             else:
-                print("🎉 APPOINTMENTS MIGHT BE AVAILABLE!")
+                logger.warning("🎉 APPOINTMENTS MIGHT BE AVAILABLE!")
                 current_url = self.driver.current_url
                 message = f"Appointments might be available! Check: {current_url}"
                 self.send_notification(message)
                 return True
                 
         except TimeoutException:
-            print("⏰ Timeout waiting for page elements")
+            logger.error("⏰ Timeout waiting for page elements")
             return False
         except NoSuchElementException as e:
-            print(f"❌ Element not found: {e}")
+            logger.error("❌ Element not found: %s", e)
             return False
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+            logger.exception("❌ Unexpected error: %s", e)
             return False
         finally:
             if self.driver:
                 self.driver.quit()
-                print("🔒 Browser closed")
+                logger.debug("🔒 Browser closed")
     
     def run_check(self):
         """Public method to run the appointment check"""
         try:
+            if self.check_saved_session_http():
+                return False
             return self.check_appointments()
         except Exception as e:
-            print(f"❌ Error during appointment check: {e}")
+            logger.exception("❌ Error during appointment check: %s", e)
             return False
 
 
 def main():
     """Main function to run the scraper"""
-    print("=" * 50)
-    print("🇩🇪 Berlin Appointment Scraper")
-    print("=" * 50)
+    setup_logging()
+
+    logger.info("=" * 50)
+    logger.info("🇩🇪 Berlin Appointment Scraper")
+    logger.info("=" * 50)
     
     scraper = BerlinAppointmentScraper(headless=False)  # Visible browser for basic mode
     
     result = scraper.run_check()
     
     if result:
-        print("\n✨ Check completed - Appointments found!")
+        logger.info("✨ Check completed - Appointments found!")
     else:
-        print("\n💤 Check completed - No appointments available")
+        logger.info("💤 Check completed - No appointments available")
     
-    print("=" * 50)
+    logger.info("=" * 50)
 
 
 if __name__ == "__main__":
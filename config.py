@@ -28,4 +28,35 @@ NOTIFICATION_CONFIG = {
     "enabled": True,
     # "endpoint_url": "YOUR_NOTIFICATION_ENDPOINT_HERE",  # Uncomment and set your URL
     "timeout": 10,  # seconds
-} 
\ No newline at end of file
+}
+
+# Session persistence (warm starts skip the checkbox-and-submit form step)
+# "ttl" is a hard limit counted from the last form submit; warm checks don't extend it,
+# so the form is submitted at least once per "ttl". Warm starts only happen when checks
+# run more often than that.
+SESSION_CONFIG = {
+    "enabled": True,
+    "store_file": ".appointment_session.json",  # cookies + availability query URL
+    "ttl": 45 * 60,  # seconds; with the 30 min `make cron-setup` schedule every other check is warm
+    "http_fast_path": True,  # try the saved session with plain requests before starting Chrome
+}
+
+# Logging settings (see logging_config.py)
+LOGGING_CONFIG = {
+    "log_file": "appointment_scraper.log",  # JSON lines, one record per line
+    "level": "INFO",  # root level
+    "levels": {  # per-component levels
+        "berlin_appointment_scraper": "INFO",
+        "run_headless": "INFO",
+        "session_store": "INFO",
+        "selenium": "WARNING",
+        "urllib3": "WARNING",
+        "WDM": "WARNING",  # webdriver-manager
+    },
+    "max_bytes": 5 * 1024 * 1024,  # rotate when the file exceeds 5 MB...
+    "rotate_interval": 24 * 60 * 60,  # ...or after one day, whichever comes first
+    "backup_count": 7,
+    "compress": True,  # gzip rotated files
+    "console": True,
+    "console_format": "%(asctime)s - %(levelname)s - %(message)s",
+}
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Logging pipeline for Berlin Appointment Scraper
+Queue-based: callers only enqueue records, a background listener thread does
+the formatting, disk I/O, rotation and compression.
+"""
+
+import atexit
+import copy
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+
+from config import LOGGING_CONFIG
+
+# Attributes every LogRecord has; anything else was passed via ``extra=``
+_RESERVED_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+_queue_handler = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as compact one-line JSON objects"""
+
+    def format(self, record):
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc)
+        entry = {
+            "ts": timestamp.isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        # Structured fields passed via extra={...}
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info or record.exc_text:
+            entry["exc"] = record.exc_text or self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that keeps exception info on the record
+    The stock ``prepare()`` folds the traceback into ``msg``; here only the
+    message arguments are merged so the listener can still write an ``exc`` field.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating file handler that rolls over on size OR age and gzips old files
+    Backups are kept as ``<file>.1.gz`` ... ``<file>.<backup_count>.gz``
+    """
+
+    def __init__(self, filename, max_bytes=0, backup_count=0, rotate_interval=0,
+                 compress=True, encoding="utf-8"):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self.rotate_interval = rotate_interval
+        # Short-lived processes (cron) must see the age of the existing file
+        self.rollover_at = self._next_rollover_time(self._file_started_at())
+        if compress:
+            self.namer = self._gzip_namer
+            self.rotator = self._gzip_rotator
+
+    def _file_started_at(self):
+        """
+        When the current log file was started: the timestamp of its first
+        record, falling back to ``st_mtime`` like TimedRotatingFileHandler
+        """
+        try:
+            with open(self.baseFilename, encoding="utf-8", errors="replace") as f:
+                first_line = f.readline()
+            mtime = os.stat(self.baseFilename).st_mtime
+        except OSError:
+            return time.time()
+        try:
+            return min(datetime.fromisoformat(json.loads(first_line)["ts"]).timestamp(), mtime)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return mtime
+
+    def _next_rollover_time(self, started_at=None):
+        if not self.rotate_interval:
+            return None
+        return (time.time() if started_at is None else started_at) + self.rotate_interval
+
+    def shouldRollover(self, record):
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = self._next_rollover_time()
+
+    @staticmethod
+    def _gzip_namer(name):
+        return name + ".gz"
+
+    @staticmethod
+    def _gzip_rotator(source, dest):
+        if not os.path.exists(source):
+            return
+        with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+
+def _build_handlers(settings):
+    """Create the handlers the listener thread writes to"""
+    file_handler = CompressingRotatingFileHandler(
+        settings["log_file"],
+        max_bytes=settings["max_bytes"],
+        backup_count=settings["backup_count"],
+        rotate_interval=settings["rotate_interval"],
+        compress=settings["compress"],
+    )
+    file_handler.setFormatter(JsonLinesFormatter())
+
+    handlers = [file_handler]
+    if settings["console"]:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter(settings["console_format"]))
+        handlers.append(console_handler)
+    return handlers
+
+
+def setup_logging(**overrides):
+    """
+    Route all logging through a QueueHandler/QueueListener pipeline
+    Keyword arguments override keys of LOGGING_CONFIG. Safe to call twice.
+    """
+    global _listener, _queue_handler
+
+    settings = {**LOGGING_CONFIG, **overrides}
+    root = logging.getLogger()
+
+    shutdown_logging()
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = StructuredQueueHandler(log_queue)
+    root.addHandler(_queue_handler)
+    root.setLevel(settings["level"])
+
+    # Per-component levels, e.g. {"selenium": "WARNING"}
+    for name, level in settings["levels"].items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, *_build_handlers(settings), respect_handler_level=True
+    )
+    _listener.start()
+    return root
+
+
+def shutdown_logging():
+    """Flush pending records and close the handlers"""
+    global _listener, _queue_handler
+
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -8,19 +8,13 @@ import sys
 import logging
 from datetime import datetime
 from berlin_appointment_scraper import BerlinAppointmentScraper
+from logging_config import setup_logging as setup_logging_pipeline
 
 
 def setup_logging():
-    """Setup logging for server deployment"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('appointment_scraper.log'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-    return logging.getLogger(__name__)
+    """Setup logging for server deployment (JSON lines file + stdout, see LOGGING_CONFIG)"""
+    setup_logging_pipeline()
+    return logging.getLogger("run_headless")
 
 
 def main():
@@ -45,7 +39,7 @@ def main():
             logger.info("💤 No appointments available")
             
     except Exception as e:
-        logger.error(f"❌ Critical error: {e}")
+        logger.exception(f"❌ Critical error: {e}")
         sys.exit(1)
     
     logger.info(f"✅ Check completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
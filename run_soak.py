@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Load/soak test for Berlin Appointment Scraper
+Polls many targets on a local simulated portal for a fixed time and reports
+throughput, latency percentiles, time-to-detection, memory growth and orphan
+browser processes.
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from berlin_appointment_scraper import BerlinAppointmentScraper
+from config import LOGGING_CONFIG
+from logging_config import setup_logging
+from session_store import SessionStore
+from simulated_portal import SimulatedPortal, random_slot_schedule
+
+logger = logging.getLogger("run_soak")
+
+ENGINE_NOTES = {
+    "http": "form step via requests: latency and orphan figures exclude Chrome",
+    "browser": "form step via Chrome: latency includes browser start-up; RSS covers this process only",
+}
+
+
+class HttpFormScraper(BerlinAppointmentScraper):
+    """
+    Scraper whose form step uses requests instead of Chrome
+    Warm checks still go through the real saved-session code; only the
+    browser part of the cold path is replaced, so high target counts fit on one box.
+    """
+
+    def check_appointments(self):
+        http_session = self.get_http_session()
+        landing = http_session.get(self.url, timeout=10)
+        landing.raise_for_status()
+
+        soup = BeautifulSoup(landing.text, "html.parser")
+        submit_button = soup.find(id="appointment_submit")
+        form = submit_button.find_parent("form") if submit_button else None
+        if form is None:
+            logger.error("❌ Element not found: appointment_submit")
+            return False
+        checkbox = soup.find(id="checkbox_overall")
+        data = {checkbox["name"]: checkbox.get("value", "on")} if checkbox else {}
+
+        query_url = urljoin(landing.url, form.get("action", ""))
+        response = http_session.post(query_url, data=data, timeout=10)
+        response.raise_for_status()
+
+        if self.session_store and self._result_page_recognised(response.text):
+            cookies = [
+                {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+                for c in http_session.cookies
+            ]
+            self.session_store.save(query_url, cookies, self.url)
+
+        if self._no_appointments_on_page(response.text):
+            return False
+        self.send_notification(f"Appointments might be available! Check: {response.url}")
+        return True
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """Nearest-rank percentiles plus max; empty input gives None values"""
+    ordered = sorted(values)
+    summary = {}
+    for point in points:
+        if ordered:
+            index = max(0, -(-point * len(ordered) // 100) - 1)
+            summary[f"p{point}"] = round(ordered[index], 4)
+        else:
+            summary[f"p{point}"] = None
+    summary["max"] = round(ordered[-1], 4) if ordered else None
+    return summary
+
+
+def _rss_bytes():
+    """Current resident set size (falls back to peak RSS off Linux)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _open_fds():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def _process_info(pid):
+    """(parent pid, name, state) of a live process, None if it's gone (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # The name is in parentheses and may itself contain spaces or parentheses
+    name = stat[stat.index("(") + 1:stat.rindex(")")]
+    fields = stat[stat.rindex(")") + 2:].split()
+    return int(fields[1]), name, fields[0]
+
+
+def _descendant_processes(root):
+    """PIDs and names of every live process below ``root`` in the process tree"""
+    try:
+        pids = [int(entry) for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return {}
+    children = {}
+    names = {}
+    for pid in pids:
+        info = _process_info(pid)
+        if info is None or info[2] == "Z":
+            continue
+        parent, names[pid], _ = info
+        children.setdefault(parent, []).append(pid)
+
+    descendants = {}
+    pending = list(children.get(root, ()))
+    while pending:
+        pid = pending.pop()
+        descendants[pid] = names[pid]
+        pending.extend(children.get(pid, ()))
+    return descendants
+
+
+def _browser_processes():
+    """chrome/chromedriver processes started by this run"""
+    return {pid: name for pid, name in _descendant_processes(os.getpid()).items()
+            if "chrom" in name.lower()}
+
+
+def _still_running(processes):
+    """The subset of ``processes`` that is still alive under the same name"""
+    running = {}
+    for pid, name in processes.items():
+        info = _process_info(pid)
+        if info is not None and info[1] == name and info[2] != "Z":
+            running[pid] = name
+    return running
+
+
+class _ResourceSampler(threading.Thread):
+    """
+    Samples RSS, open file descriptors and thread count once per ``period``
+    Also remembers every browser process seen, so ones that outlive their
+    chromedriver (and get re-parented away from us) can still be reported.
+    """
+
+    def __init__(self, period=1.0):
+        super().__init__(name="soak-sampler", daemon=True)
+        self.period = period
+        self.samples = []
+        self.browsers = {}
+        self._stop_event = threading.Event()
+
+    def sample(self):
+        self.samples.append((time.monotonic(), _rss_bytes(), _open_fds(), threading.active_count()))
+        self.browsers.update(_browser_processes())
+
+    def run(self):
+        while not self._stop_event.wait(self.period):
+            self.sample()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.sample()
+
+
+def _poll_targets(scrapers, portal, interval, deadline, workers):
+    """
+    Daemon loop: check every target once per ``interval`` until ``deadline``
+    Returns one record per check.
+    """
+    now = time.monotonic()
+    count = len(scrapers)
+    # Stagger the first checks so the targets don't all fire at once
+    schedule = [(now + interval * target / count, target) for target in range(count)]
+    heapq.heapify(schedule)
+    lock = threading.Lock()
+    records = []
+
+    def worker():
+        while True:
+            with lock:
+                if not schedule:
+                    next_due = None
+                else:
+                    due, target = heapq.heappop(schedule)
+                    if due >= deadline:
+                        heapq.heappush(schedule, (due, target))
+                        return
+                    next_due = due
+            if next_due is None:
+                # Every target is being checked by another worker
+                if time.monotonic() >= deadline:
+                    return
+                time.sleep(min(interval, 0.05))
+                continue
+            time.sleep(max(0.0, due - time.monotonic()))
+
+            start = time.monotonic()
+            found = scrapers[target].run_check()
+            end = time.monotonic()
+            records.append({
+                "target": target,
+                "due": due - portal.started_at,
+                "start": start - portal.started_at,
+                "end": end - portal.started_at,
+                "found": found,
+            })
+
+            with lock:
+                heapq.heappush(schedule, (max(due + interval, end), target))
+
+    threads = [threading.Thread(target=worker, name=f"soak-worker-{i}") for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return records
+
+
+def _detection_report(records, portal):
+    """Time-to-detection against the portal's slot schedule, plus false positives"""
+    found = [r for r in records if r["found"]]
+    times_to_detection = []
+    missed = 0
+    for target, windows in portal.slot_schedule.items():
+        for open_at, close_at in windows:
+            hits = [r["end"] - open_at for r in found
+                    if r["target"] == target and r["end"] > open_at and r["start"] < close_at]
+            if hits:
+                times_to_detection.append(min(hits))
+            else:
+                missed += 1
+
+    false_positives = sum(
+        1 for r in found
+        if not any(r["end"] > open_at and r["start"] < close_at
+                   for open_at, close_at in portal.slot_schedule.get(r["target"], ()))
+    )
+    return {
+        "slot_windows": len(times_to_detection) + missed,
+        "detected": len(times_to_detection),
+        "missed": missed,
+        "time_to_detection_s": percentiles(times_to_detection),
+        "false_positives": false_positives,
+    }
+
+
+def run_soak(engine="http", targets=50, duration=60.0, interval=5.0, workers=16,
+             latency=0.05, jitter=0.05, error_rate=0.01, captcha_rate=0.0,
+             slot_fraction=0.2, slot_window=30.0, session_ttl=600, seed=None):
+    """Run the checker against a simulated portal and return the report dict"""
+    # More workers than targets would only sit idle
+    workers = max(1, min(workers, targets))
+    rng = random.Random(seed)
+    schedule = random_slot_schedule(targets, duration, slot_fraction, slot_window, rng)
+    scraper_class = HttpFormScraper if engine == "http" else BerlinAppointmentScraper
+
+    with tempfile.TemporaryDirectory(prefix="soak-sessions-") as session_dir, \
+            SimulatedPortal(targets, latency=latency, jitter=jitter, error_rate=error_rate,
+                            captcha_rate=captcha_rate, slot_schedule=schedule,
+                            session_ttl=session_ttl, seed=rng.random()) as portal:
+        scrapers = [
+            scraper_class(
+                headless=True,
+                session_store=SessionStore(os.path.join(session_dir, f"session-{target}.json")),
+                url=portal.landing_url(target),
+                # A fixed port would let chromedriver attach to another worker's browser
+                debugging_port=None,
+            )
+            for target in range(targets)
+        ]
+
+        sampler = _ResourceSampler()
+        sampler.sample()
+        sampler.start()
+        started = time.monotonic()
+        records = _poll_targets(scrapers, portal, interval, started + duration, workers)
+        elapsed = time.monotonic() - started
+
+        # Close keep-alive connections first so the last sample only shows real leaks
+        for scraper in scrapers:
+            if scraper.http_session is not None:
+                scraper.http_session.close()
+        time.sleep(0.5)
+        sampler.stop()
+
+    time.sleep(1.0)  # Grace period for browsers that are still shutting down
+    sampler.browsers.update(_browser_processes())
+    orphans = _still_running(sampler.browsers)
+
+    rss = [sample[1] for sample in sampler.samples]
+    first, last = sampler.samples[0], sampler.samples[-1]
+    megabyte = 1024 * 1024
+    return {
+        "engine": engine,
+        "note": ENGINE_NOTES[engine],
+        "targets": targets,
+        "duration_s": round(elapsed, 2),
+        "interval_s": interval,
+        "workers": workers,
+        "checks": len(records),
+        "throughput_per_s": round(len(records) / elapsed, 2) if elapsed else None,
+        "target_rate_per_s": round(targets / interval, 2),
+        "latency_s": percentiles([r["end"] - r["start"] for r in records]),
+        "schedule_lag_s": percentiles([r["start"] - r["due"] for r in records]),
+        "detection": _detection_report(records, portal),
+        "memory": {
+            "rss_start_mb": round(first[1] / megabyte, 1),
+            "rss_end_mb": round(last[1] / megabyte, 1),
+            "rss_peak_mb": round(max(rss) / megabyte, 1),
+            "rss_growth_mb": round((last[1] - first[1]) / megabyte, 1),
+            "open_fds_start": first[2],
+            "open_fds_end": last[2],
+            "threads_start": first[3],
+            "threads_end": last[3],
+        },
+        "orphan_processes": [f"{pid} {name}" for pid, name in sorted(orphans.items())],
+        "portal": dict(portal.stats),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load/soak test against a simulated portal")
+    parser.add_argument("--engine", choices=["http", "browser"], default="http",
+                        help="http: requests-only checks; browser: real Chrome for the form step")
+    parser.add_argument("--targets", type=int, default=50, help="number of simulated services")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between checks of a target")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent checks")
+    parser.add_argument("--latency", type=float, default=0.05, help="portal base latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="extra random latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="share of HTTP 500 responses")
+    parser.add_argument("--captcha-rate", type=float, default=0.0, help="share of captcha pages")
+    parser.add_argument("--slot-fraction", type=float, default=0.2,
+                        help="share of targets whose slots open during the run")
+    parser.add_argument("--slot-window", type=float, default=30.0, help="seconds slots stay open")
+    parser.add_argument("--session-ttl", type=float, default=600, help="portal session lifetime (s)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible runs")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write the report here")
+    parser.add_argument("--log-file", default="soak_test.log", help="JSON lines log of the run")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function for the soak test"""
+    args = parse_args(argv)
+    setup_logging(
+        log_file=args.log_file,
+        levels={**LOGGING_CONFIG["levels"], "berlin_appointment_scraper": "WARNING",
+                "session_store": "WARNING", "run_soak": "INFO"},
+    )
+
+    logger.info("=" * 60)
+    logger.info("🧪 Soak test: %s targets, %ss, every %ss (%s engine)",
+                args.targets, args.duration, args.interval, args.engine)
+    logger.info("=" * 60)
+
+    report = run_soak(
+        engine=args.engine, targets=args.targets, duration=args.duration, interval=args.interval,
+        workers=args.workers, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, captcha_rate=args.captcha_rate,
+        slot_fraction=args.slot_fraction, slot_window=args.slot_window,
+        session_ttl=args.session_ttl, seed=args.seed,
+    )
+
+    for key, value in report.items():
+        logger.info("📊 %s: %s", key, value)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logger.info("💾 Report written to %s", args.json_path)
+
+    if report["orphan_processes"]:
+        logger.warning("⚠️ Orphan browser processes: %s", report["orphan_processes"])
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
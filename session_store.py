@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Session store for Berlin Appointment Scraper
+Persists the portal session cookies and the availability query URL the form
+submits to, so later checks can skip the checkbox-and-submit form step while
+the session is valid.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+
+from config import SESSION_CONFIG
+
+logger = logging.getLogger("session_store")
+
+
+class SessionStore:
+    """Small JSON file store with TTL-based invalidation"""
+
+    def __init__(self, path=None, ttl=None):
+        self.path = path or SESSION_CONFIG["store_file"]
+        self.ttl = SESSION_CONFIG["ttl"] if ttl is None else ttl
+
+    def load(self, landing_url=None):
+        """
+        Return the saved session dict or None if missing, corrupt or expired
+        The dict has ``landing_url``, ``query_url``, ``cookies`` and ``saved_at``
+        keys. With ``landing_url`` given, sessions saved for another service are ignored.
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                session = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️ Ignoring unreadable session store %s: %s", self.path, e)
+            return None
+
+        if not isinstance(session, dict) or not session.get("query_url"):
+            return None
+        if landing_url is not None and session.get("landing_url") != landing_url:
+            logger.debug("🔀 Saved session belongs to %s, ignoring", session.get("landing_url"))
+            return None
+
+        age = time.time() - session.get("saved_at", 0)
+        if age >= self.ttl:
+            logger.debug("⌛ Saved session expired (%.0fs old)", age)
+            return None
+        return session
+
+    def save(self, query_url, cookies, landing_url=None):
+        """
+        Persist the availability query URL and cookies for the service at ``landing_url``
+        The TTL is a hard limit counted from this save, i.e. from the last form submit.
+        """
+        session = {
+            "landing_url": landing_url,
+            "query_url": query_url,
+            "cookies": [dict(cookie) for cookie in cookies],
+            "saved_at": time.time(),
+        }
+        if not self._write(session):
+            return False
+        logger.debug("💾 Saved session for %s", query_url)
+        return True
+
+    def _write(self, session):
+        """Write the store atomically with owner-only permissions"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".session-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(session, f)
+                os.chmod(tmp_path, 0o600)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("⚠️ Could not save session: %s", e)
+            return False
+        return True
+
+    def invalidate(self):
+        """Forget the saved session"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("⚠️ Could not remove session store %s: %s", self.path, e)
+
+
+def selenium_to_cdp_cookie(cookie):
+    """Convert a Selenium cookie dict to a CDP ``Network.CookieParam``"""
+    param = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain", ""),
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False),
+    }
+    if cookie.get("sameSite"):
+        param["sameSite"] = cookie["sameSite"]
+    if cookie.get("expiry"):
+        param["expires"] = cookie["expiry"]
+    return param
+
+
+def apply_cookies_to_requests(http_session, cookies):
+    """Load Selenium cookie dicts into a ``requests.Session`` cookie jar"""
+    for cookie in cookies:
+        http_session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain", ""),
+            path=cookie.get("path", "/"),
+        )
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Simulated Berlin service portal for load/soak testing
+Serves the landing page, the checkbox-and-submit form and the results page on
+localhost, with injectable latency, server errors, captcha pages and slots that
+open and close on a schedule.
+"""
+
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+NO_APPOINTMENTS_TEXT = "Leider sind aktuell keine Termine für ihre Auswahl verfügbar."
+SESSION_COOKIE = "Zmsappointment"
+
+LANDING_PAGE = """<!DOCTYPE html>
+<html><body>
+<h1>Einbürgerungstest ({target})</h1>
+<form method="post" action="/terminvereinbarung/termin/all/{target}/">
+  <input type="checkbox" id="checkbox_overall" name="all_locations" value="1">
+  <label for="checkbox_overall">Alle Standorte auswählen</label>
+  <button type="submit" id="appointment_submit">An diesem Standort einen Termin buchen</button>
+</form>
+</body></html>"""
+
+NO_APPOINTMENTS_PAGE = """<!DOCTYPE html>
+<html><body><div class="alert">{text}</div></body></html>""".format(text=NO_APPOINTMENTS_TEXT)
+
+SLOTS_PAGE = """<!DOCTYPE html>
+<html><body><table class="calendar-month-table">
+<tr><td class="nichtbuchbar">14</td>
+<td class="buchbar"><a href="/terminvereinbarung/termin/time/{target}/">15</a></td></tr>
+</table></body></html>"""
+
+# Calendar after the slots of a session's query are gone again
+FULL_CALENDAR_PAGE = """<!DOCTYPE html>
+<html><body><table class="calendar-month-table">
+<tr><td class="nichtbuchbar">14</td><td class="nichtbuchbar">15</td></tr>
+</table></body></html>"""
+
+SESSION_EXPIRED_PAGE = """<!DOCTYPE html>
+<html><body><h1>Ihre Sitzung ist abgelaufen.</h1></body></html>"""
+
+CAPTCHA_PAGE = """<!DOCTYPE html>
+<html><body><h1>Bitte bestätigen Sie, dass Sie kein Roboter sind.</h1>
+<div class="captcha"></div></body></html>"""
+
+
+def random_slot_schedule(targets, duration, fraction=0.2, window=30.0, rng=None):
+    """
+    Open slots for a ``fraction`` of the targets at a random time within ``duration``
+    Returns ``{target: [(open_at, close_at)]}`` in seconds since portal start.
+    """
+    rng = rng or random.Random()
+    schedule = {}
+    count = round(targets * fraction)
+    for target in rng.sample(range(targets), count):
+        open_at = rng.uniform(0, max(duration - window, 0))
+        schedule[target] = [(open_at, open_at + window)]
+    return schedule
+
+
+class _PortalRequestHandler(BaseHTTPRequestHandler):
+    """Request handler; all state lives on ``self.server.portal``"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.portal.handle(self, "GET")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.server.portal.handle(self, "POST")
+
+
+class _PortalServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class SimulatedPortal:
+    """Local stand-in for service.berlin.de with fault injection"""
+
+    def __init__(self, targets=1, latency=0.0, jitter=0.0, error_rate=0.0, captcha_rate=0.0,
+                 slot_schedule=None, session_ttl=600, host="127.0.0.1", port=0, seed=None):
+        self.targets = targets
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.captcha_rate = captcha_rate
+        self.slot_schedule = slot_schedule or {}
+        self.session_ttl = session_ttl
+        self.stats = Counter()
+        self.started_at = None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._server = _PortalServer((host, port), _PortalRequestHandler)
+        self._server.portal = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def landing_url(self, target):
+        """URL the scraper starts from for a target"""
+        return f"{self.base_url}/dienstleistung/{target}/"
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._server.serve_forever, name="simulated-portal",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def elapsed(self):
+        """Seconds since the portal was started"""
+        return time.monotonic() - self.started_at
+
+    def slots_open(self, target, at=None):
+        """Ground truth: are slots bookable for ``target`` at ``at`` seconds since start"""
+        at = self.elapsed() if at is None else at
+        return any(open_at <= at < close_at for open_at, close_at in self.slot_schedule.get(target, ()))
+
+    def _roll(self, rate):
+        if not rate:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def handle(self, request, method):
+        """Route a request, applying latency and injected faults first"""
+        self._count("requests")
+
+        delay = self.latency
+        if self.jitter:
+            with self._lock:
+                delay += self._rng.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+        if self._roll(self.error_rate):
+            self._count("errors")
+            return self._send(request, 500, "<html><body>Internal Server Error</body></html>")
+        if self._roll(self.captcha_rate):
+            self._count("captchas")
+            return self._send(request, 200, CAPTCHA_PAGE)
+
+        url = urlparse(request.path)
+        parts = [part for part in url.path.split("/") if part]
+
+        if method == "GET" and len(parts) == 2 and parts[0] == "dienstleistung":
+            return self._landing(request, parts[1])
+        # The availability query: POSTed by the form, and re-run by a plain GET like the live portal
+        if parts[:3] == ["terminvereinbarung", "termin", "all"] and len(parts) == 4:
+            return self._submit(request, parts[3])
+        if method == "GET" and parts == ["terminvereinbarung", "termin", "day"]:
+            return self._results(request, parse_qs(url.query).get("id", [""])[0])
+        # Fixed "no appointments" page: shows the message whatever the session or slots
+        if method == "GET" and parts == ["terminvereinbarung", "termin", "taken"]:
+            return self._send(request, 200, NO_APPOINTMENTS_PAGE)
+        return self._send(request, 404, "<html><body>Not Found</body></html>")
+
+    def _target(self, value):
+        try:
+            target = int(value)
+        except ValueError:
+            return None
+        return target if 0 <= target < self.targets else None
+
+    def _landing(self, request, value):
+        target = self._target(value)
+        if target is None:
+            return self._send(request, 404, "<html><body>Not Found</body></html>")
+        return self._send(request, 200, LANDING_PAGE.format(target=target))
+
+    def _submit(self, request, value):
+        target = self._target(value)
+        if target is None:
+            return self._send(request, 404, "<html><body>Not Found</body></html>")
+
+        headers = {}
+        if not self._session_valid(request, target):
+            token = secrets.token_hex(16)
+            now = time.monotonic()
+            with self._lock:
+                self._sessions[token] = (target, now + self.session_ttl)
+                self.stats["sessions_created"] += 1
+                # Drop expired sessions now and then so long runs don't grow without bound
+                if self.stats["sessions_created"] % 256 == 0:
+                    self._sessions = {
+                        key: value for key, value in self._sessions.items() if value[1] > now
+                    }
+            headers["Set-Cookie"] = f"{SESSION_COOKIE}={token}; Path=/; HttpOnly"
+
+        if self.slots_open(target):
+            headers["Location"] = f"/terminvereinbarung/termin/day/?id={target}"
+        else:
+            headers["Location"] = "/terminvereinbarung/termin/taken/"
+        return self._send(request, 302, "", headers)
+
+    def _session_valid(self, request, target):
+        """Does the request carry an unexpired session cookie for ``target``"""
+        cookie = SimpleCookie(request.headers.get("Cookie", ""))
+        token = cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+        if token is None:
+            return False
+
+        with self._lock:
+            session = self._sessions.get(token)
+            if session and session[1] <= time.monotonic():
+                del self._sessions[token]
+                session = None
+        return bool(session) and session[0] == target
+
+    def _results(self, request, value):
+        target = self._target(value)
+        if target is None or not self._session_valid(request, target):
+            self._count("expired_sessions")
+            return self._send(request, 200, SESSION_EXPIRED_PAGE)
+
+        if self.slots_open(target):
+            self._count("slot_pages")
+            return self._send(request, 200, SLOTS_PAGE.format(target=target))
+        return self._send(request, 200, FULL_CALENDAR_PAGE)
+
+    def _send(self, request, status, body, headers=None):
+        payload = body.encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "text/html; charset=utf-8")
+        request.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(payload)
@@ -3,13 +3,20 @@
 Test script for Berlin Appointment Scraper
 """
 
+import logging
+
 from berlin_appointment_scraper import BerlinAppointmentScraper
+from logging_config import setup_logging
+
+logger = logging.getLogger("test_scraper")
 
 
 def test_scraper():
     """Test the scraper with visible browser for debugging"""
-    print("🧪 Testing Berlin Appointment Scraper")
-    print("-" * 40)
+    setup_logging()
+
+    logger.info("🧪 Testing Berlin Appointment Scraper")
+    logger.info("-" * 40)
     
     # Create scraper instance with visible browser for testing
     scraper = BerlinAppointmentScraper(headless=False)
@@ -17,8 +24,8 @@ def test_scraper():
     # Run the check
     result = scraper.run_check()
     
-    print(f"\n📊 Test Result: {'✅ Success' if result is not None else '❌ Failed'}")
-    print(f"🎯 Appointments Available: {'Yes' if result else 'No'}")
+    logger.info("📊 Test Result: %s", '✅ Success' if result is not None else '❌ Failed')
+    logger.info("🎯 Appointments Available: %s", 'Yes' if result else 'No')
     
     return result
 
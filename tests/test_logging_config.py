@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Tests for the logging pipeline
+"""
+
+import gzip
+import json
+import logging
+import logging.handlers
+import pytest
+import sys
+import os
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+# Add the parent directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging_config
+from logging_config import (
+    CompressingRotatingFileHandler,
+    JsonLinesFormatter,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+def make_record(msg="hello %s", args=("world",), level=logging.INFO, **extra):
+    record = logging.LogRecord("component", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJsonLinesFormatter:
+    """Test JSON lines formatting"""
+
+    def test_format_is_single_json_line(self):
+        """Test that a record becomes one compact JSON object"""
+        line = JsonLinesFormatter().format(make_record())
+
+        assert "\n" not in line
+        entry = json.loads(line)
+        assert entry["msg"] == "hello world"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "component"
+        assert "ts" in entry
+
+    def test_format_includes_extra_fields(self):
+        """Test that fields passed via extra= end up in the JSON object"""
+        entry = json.loads(JsonLinesFormatter().format(make_record(url="https://example.org")))
+        assert entry["url"] == "https://example.org"
+
+    def test_format_includes_exception(self):
+        """Test that exception info is serialised"""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = make_record(level=logging.ERROR)
+            record.exc_info = sys.exc_info()
+
+        entry = json.loads(JsonLinesFormatter().format(record))
+        assert "ValueError: boom" in entry["exc"]
+
+
+class TestCompressingRotatingFileHandler:
+    """Test size/time based rotation with compression"""
+
+    def test_size_rollover_compresses_backup(self, tmp_path):
+        """Test that exceeding max_bytes rotates into a gzip backup"""
+        log_file = tmp_path / "scraper.log"
+        handler = CompressingRotatingFileHandler(str(log_file), max_bytes=50, backup_count=2)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+
+        for _ in range(5):
+            handler.emit(make_record(msg="x" * 30, args=()))
+        handler.close()
+
+        backup = tmp_path / "scraper.log.1.gz"
+        assert backup.exists()
+        assert not (tmp_path / "scraper.log.3.gz").exists()
+        with gzip.open(backup, "rt") as f:
+            assert "x" * 30 in f.read()
+
+    def test_time_rollover(self, tmp_path):
+        """Test that an expired interval triggers rollover regardless of size"""
+        handler = CompressingRotatingFileHandler(
+            str(tmp_path / "scraper.log"), backup_count=1, rotate_interval=60
+        )
+
+        assert handler.shouldRollover(make_record()) is False
+        handler.rollover_at = 0
+        assert handler.shouldRollover(make_record()) is True
+        handler.close()
+
+    def test_time_rollover_uses_existing_file_age(self, tmp_path):
+        """Test that a fresh handler (e.g. a cron run) rotates a file that is already old"""
+        log_file = tmp_path / "scraper.log"
+        old = time.time() - 2 * 86400
+        first_record = {"ts": datetime.fromtimestamp(old, timezone.utc).isoformat(), "msg": "old"}
+        log_file.write_text(json.dumps(first_record) + "\n")
+        # A recent write must not reset the age of the file
+        os.utime(log_file, (time.time(), time.time()))
+
+        handler = CompressingRotatingFileHandler(str(log_file), backup_count=1, rotate_interval=86400)
+        assert handler.shouldRollover(make_record()) is True
+        handler.close()
+
+    def test_time_rollover_falls_back_to_mtime(self, tmp_path):
+        """Test that a non-JSON file is aged by its modification time"""
+        log_file = tmp_path / "scraper.log"
+        log_file.write_text("plain text log\n")
+        old = time.time() - 2 * 86400
+        os.utime(log_file, (old, old))
+
+        handler = CompressingRotatingFileHandler(str(log_file), backup_count=1, rotate_interval=86400)
+        assert handler.shouldRollover(make_record()) is True
+        handler.close()
+
+    def test_time_rollover_recent_file(self, tmp_path):
+        """Test that a young file is kept"""
+        log_file = tmp_path / "scraper.log"
+        log_file.write_text(json.dumps({"ts": datetime.now(timezone.utc).isoformat()}) + "\n")
+
+        handler = CompressingRotatingFileHandler(str(log_file), backup_count=1, rotate_interval=86400)
+        assert handler.shouldRollover(make_record()) is False
+        handler.close()
+
+    def test_no_compression(self, tmp_path):
+        """Test that compress=False keeps plain backups"""
+        log_file = tmp_path / "scraper.log"
+        handler = CompressingRotatingFileHandler(
+            str(log_file), max_bytes=10, backup_count=1, compress=False
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+
+        for _ in range(3):
+            handler.emit(make_record(msg="y" * 20, args=()))
+        handler.close()
+
+        assert (tmp_path / "scraper.log.1").exists()
+
+
+class TestSetupLogging:
+    """Test the queue based pipeline"""
+
+    @pytest.fixture(autouse=True)
+    def restore_logging(self):
+        root = logging.getLogger()
+        level = root.level
+        yield
+        shutdown_logging()
+        root.setLevel(level)
+
+    def test_records_go_through_queue(self, tmp_path):
+        """Test that the root logger only has a QueueHandler added"""
+        setup_logging(log_file=str(tmp_path / "scraper.log"), console=False)
+
+        root_handlers = logging.getLogger().handlers
+        assert logging_config._queue_handler in root_handlers
+        assert isinstance(logging_config._queue_handler, logging.handlers.QueueHandler)
+
+    def test_writes_json_lines(self, tmp_path):
+        """Test end-to-end writing through the listener thread"""
+        log_file = tmp_path / "scraper.log"
+        setup_logging(log_file=str(log_file), console=False)
+
+        logging.getLogger("berlin_appointment_scraper").info("check %d", 1)
+        shutdown_logging()
+
+        entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert entries[-1]["msg"] == "check 1"
+        assert entries[-1]["logger"] == "berlin_appointment_scraper"
+
+    def test_exception_through_pipeline(self, tmp_path):
+        """Test that tracebacks end up in the exc field, not in msg"""
+        log_file = tmp_path / "scraper.log"
+        setup_logging(log_file=str(log_file), console=False)
+
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("berlin_appointment_scraper").exception("check %s failed", "x")
+        shutdown_logging()
+
+        entry = json.loads(log_file.read_text().splitlines()[-1])
+        assert entry["msg"] == "check x failed"
+        assert "ValueError: boom" in entry["exc"]
+        assert "Traceback" not in entry["msg"]
+
+    def test_per_component_levels(self, tmp_path):
+        """Test that component levels from the config are applied"""
+        setup_logging(
+            log_file=str(tmp_path / "scraper.log"),
+            console=False,
+            levels={"noisy.component": "ERROR"},
+        )
+        assert logging.getLogger("noisy.component").level == logging.ERROR
+
+    def test_setup_twice_replaces_pipeline(self, tmp_path):
+        """Test that calling setup_logging again doesn't stack handlers"""
+        setup_logging(log_file=str(tmp_path / "a.log"), console=False)
+        setup_logging(log_file=str(tmp_path / "b.log"), console=False)
+
+        queue_handlers = [
+            h for h in logging.getLogger().handlers
+            if isinstance(h, logging.handlers.QueueHandler)
+        ]
+        assert len(queue_handlers) == 1
+
+    def test_shutdown_without_setup(self):
+        """Test that shutdown is a no-op when nothing was set up"""
+        with patch.object(logging_config, "_listener", None):
+            shutdown_logging()
@@ -11,7 +11,15 @@ import os
 # Add the parent directory to the path to import the scraper
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import config
 from berlin_appointment_scraper import BerlinAppointmentScraper
+from session_store import SessionStore
+
+
+@pytest.fixture(autouse=True)
+def no_saved_session(monkeypatch):
+    """Keep tests away from the real session store file"""
+    monkeypatch.setitem(config.SESSION_CONFIG, "enabled", False)
 
 
 class TestBerlinAppointmentScraper:
@@ -47,6 +55,17 @@ class TestBerlinAppointmentScraper:
         assert scraper.driver == mock_driver
         mock_chrome.assert_called_once()
 
+    @patch('berlin_appointment_scraper.webdriver.Chrome')
+    @patch('berlin_appointment_scraper.ChromeDriverManager')
+    def test_setup_driver_debugging_port(self, mock_driver_manager, mock_chrome):
+        """Test that the remote debugging port is configurable and can be left to chromedriver"""
+        for port, expected in [(9222, True), (None, False)]:
+            scraper = BerlinAppointmentScraper(headless=True, debugging_port=port)
+            scraper.setup_driver()
+            arguments = mock_chrome.call_args.kwargs['options'].arguments
+            has_port = any(arg.startswith("--remote-debugging-port") for arg in arguments)
+            assert has_port is expected
+
     @patch('berlin_appointment_scraper.webdriver.Chrome')
     @patch('berlin_appointment_scraper.ChromeDriverManager')
     def test_setup_driver_fallback(self, mock_driver_manager, mock_chrome):
@@ -62,17 +81,17 @@ class TestBerlinAppointmentScraper:
         scraper = BerlinAppointmentScraper(headless=True)
         
         # This should not raise an exception and should use fallback
-        with patch('builtins.print'):  # Suppress print output
+        with patch('berlin_appointment_scraper.logger'):  # Suppress log output
             scraper.setup_driver()
 
     def test_send_notification(self):
-        """Test notification sending (currently just prints)"""
+        """Test notification sending (currently just logs)"""
         scraper = BerlinAppointmentScraper()
         
-        # Capture print output
-        with patch('builtins.print') as mock_print:
+        # Capture log output
+        with patch('berlin_appointment_scraper.logger') as mock_logger:
             scraper.send_notification("Test message")
-            mock_print.assert_called_with("🔔 NOTIFICATION: Test message")
+            mock_logger.warning.assert_called_with("🔔 NOTIFICATION: %s", "Test message")
 
     @patch.object(BerlinAppointmentScraper, 'setup_driver')
     def test_check_appointments_driver_setup_called(self, mock_setup_driver):
@@ -146,7 +165,7 @@ class TestBerlinAppointmentScraper:
             with patch('berlin_appointment_scraper.WebDriverWait') as mock_wait:
                 mock_wait.return_value.until.side_effect = TimeoutException()
                 
-                with patch('builtins.print'):  # Suppress print output
+                with patch('berlin_appointment_scraper.logger'):  # Suppress log output
                     result = scraper.check_appointments()
                     
         assert result is False
@@ -161,7 +180,7 @@ class TestBerlinAppointmentScraper:
             with patch('berlin_appointment_scraper.WebDriverWait') as mock_wait:
                 mock_wait.return_value.until.side_effect = NoSuchElementException()
                 
-                with patch('builtins.print'):  # Suppress print output
+                with patch('berlin_appointment_scraper.logger'):  # Suppress log output
                     result = scraper.check_appointments()
                     
         assert result is False
@@ -171,7 +190,7 @@ class TestBerlinAppointmentScraper:
         scraper = BerlinAppointmentScraper()
         
         with patch.object(scraper, 'setup_driver', side_effect=Exception("General error")):
-            with patch('builtins.print'):  # Suppress print output
+            with patch('berlin_appointment_scraper.logger'):  # Suppress log output
                 result = scraper.check_appointments()
                 
         assert result is False
@@ -187,7 +206,7 @@ class TestBerlinAppointmentScraper:
             # Force an exception to test cleanup
             mock_driver.get.side_effect = Exception("Test exception")
             
-            with patch('builtins.print'):  # Suppress print output
+            with patch('berlin_appointment_scraper.logger'):  # Suppress log output
                 scraper.check_appointments()
                 
             # Verify driver.quit() was called
@@ -207,12 +226,217 @@ class TestBerlinAppointmentScraper:
         scraper = BerlinAppointmentScraper()
         
         with patch.object(scraper, 'check_appointments', side_effect=Exception("Test error")):
-            with patch('builtins.print'):  # Suppress print output
+            with patch('berlin_appointment_scraper.logger'):  # Suppress log output
                 result = scraper.run_check()
                 
         assert result is False
 
 
+class TestSavedSession:
+    """Test warm starts from a saved session"""
+
+    NO_APPOINTMENTS = "Leider sind aktuell keine Termine für ihre Auswahl verfügbar."
+    QUERY_URL = "https://service.berlin.de/terminvereinbarung/termin/all/351180/"
+    TAKEN_URL = "https://service.berlin.de/terminvereinbarung/termin/taken/"
+    LANDING_URL = "https://service.berlin.de/dienstleistung/351180/"
+    COOKIES = [{"name": "Zmsappointment", "value": "abc", "domain": "service.berlin.de", "path": "/"}]
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = SessionStore(path=str(tmp_path / "session.json"), ttl=600)
+        store.save(self.QUERY_URL, self.COOKIES, self.LANDING_URL)
+        return store
+
+    def form_wait(self, mock_wait):
+        """Make the patched WebDriverWait return a submit button inside a form"""
+        element = mock_wait.return_value.until.return_value
+        element.is_selected.return_value = False
+        element.find_element.return_value.get_attribute.return_value = self.QUERY_URL
+
+    def test_browser_warm_start_skips_form(self, store):
+        """Test that a valid saved session re-runs the query without the form"""
+        scraper = BerlinAppointmentScraper(session_store=store)
+        mock_driver = MagicMock()
+        mock_driver.page_source = self.NO_APPOINTMENTS
+
+        with patch.object(scraper, 'setup_driver'):
+            with patch('berlin_appointment_scraper.WebDriverWait'):
+                scraper.driver = mock_driver
+                result = scraper.check_appointments()
+
+        assert result is False
+        mock_driver.get.assert_called_once_with(self.QUERY_URL)
+        mock_driver.execute_cdp_cmd.assert_called_once()
+        assert store.load(self.LANDING_URL) is not None
+
+    def test_browser_expired_session_redoes_form(self, store):
+        """Test that an unusable saved session is dropped and the form is submitted"""
+        scraper = BerlinAppointmentScraper(session_store=store)
+        mock_driver = MagicMock()
+        mock_driver.page_source = "Sitzung abgelaufen"
+        mock_driver.current_url = self.TAKEN_URL
+        mock_driver.get_cookies.return_value = self.COOKIES
+
+        with patch.object(scraper, 'setup_driver'):
+            with patch('berlin_appointment_scraper.WebDriverWait') as mock_wait:
+                self.form_wait(mock_wait)
+                with patch('berlin_appointment_scraper.time.sleep'):
+                    with patch.object(scraper, 'send_notification'):
+                        scraper.driver = mock_driver
+                        scraper.check_appointments()
+
+        assert mock_driver.get.call_args_list[-1].args == (scraper.url,)
+        # The page after submit isn't a recognised result either, so nothing is saved
+        assert store.load(self.LANDING_URL) is None
+
+    def test_form_flow_saves_query_url(self, tmp_path):
+        """Test that the form's query URL, not the fixed page it ends on, is saved"""
+        store = SessionStore(path=str(tmp_path / "session.json"), ttl=600)
+        scraper = BerlinAppointmentScraper(session_store=store)
+        mock_driver = MagicMock()
+        mock_driver.page_source = self.NO_APPOINTMENTS
+        mock_driver.current_url = self.TAKEN_URL
+        mock_driver.get_cookies.return_value = self.COOKIES
+
+        with patch.object(scraper, 'setup_driver'):
+            with patch('berlin_appointment_scraper.WebDriverWait') as mock_wait:
+                self.form_wait(mock_wait)
+                with patch('berlin_appointment_scraper.time.sleep'):
+                    scraper.driver = mock_driver
+                    scraper.check_appointments()
+
+        saved = store.load(self.LANDING_URL)
+        assert saved["query_url"] == self.QUERY_URL
+        assert saved["cookies"] == self.COOKIES
+
+    def test_form_flow_calendar_page_saved(self, tmp_path):
+        """Test that a calendar after submit counts as a recognised result"""
+        store = SessionStore(path=str(tmp_path / "session.json"), ttl=600)
+        scraper = BerlinAppointmentScraper(session_store=store)
+        mock_driver = MagicMock()
+        mock_driver.page_source = '<table class="calendar-month-table"><td class="buchbar">15</td></table>'
+        mock_driver.get_cookies.return_value = self.COOKIES
+
+        with patch.object(scraper, 'setup_driver'):
+            with patch('berlin_appointment_scraper.WebDriverWait') as mock_wait:
+                self.form_wait(mock_wait)
+                with patch('berlin_appointment_scraper.time.sleep'):
+                    with patch.object(scraper, 'send_notification'):
+                        scraper.driver = mock_driver
+                        assert scraper.check_appointments() is True
+
+        assert store.load(self.LANDING_URL)["query_url"] == self.QUERY_URL
+
+    def test_form_flow_captcha_not_saved(self, tmp_path):
+        """Test that a captcha page after submit isn't saved as a session"""
+        store = SessionStore(path=str(tmp_path / "session.json"), ttl=600)
+        scraper = BerlinAppointmentScraper(session_store=store)
+        mock_driver = MagicMock()
+        mock_driver.page_source = '<div class="captcha">Bitte bestätigen Sie, dass Sie kein Roboter sind.</div>'
+        mock_driver.get_cookies.return_value = self.COOKIES
+
+        with patch.object(scraper, 'setup_driver'):
+            with patch('berlin_appointment_scraper.WebDriverWait') as mock_wait:
+                self.form_wait(mock_wait)
+                with patch('berlin_appointment_scraper.time.sleep'):
+                    with patch.object(scraper, 'send_notification'):
+                        scraper.driver = mock_driver
+                        scraper.check_appointments()
+
+        assert store.load(self.LANDING_URL) is None
+
+    def test_http_fast_path_skips_browser(self, store):
+        """Test that run_check answers from the saved session without Chrome"""
+        scraper = BerlinAppointmentScraper(session_store=store)
+
+        with patch('berlin_appointment_scraper.requests.Session') as mock_session_class:
+            mock_session = mock_session_class.return_value
+            mock_session.get.return_value.ok = True
+            mock_session.get.return_value.text = self.NO_APPOINTMENTS
+            with patch.object(scraper, 'check_appointments') as mock_check:
+                result = scraper.run_check()
+
+        assert result is False
+        mock_check.assert_not_called()
+        mock_session.get.assert_called_once_with(self.QUERY_URL, timeout=10)
+
+    def test_http_fast_path_possible_slots_falls_back(self, store):
+        """Test that run_check keeps the session and uses the browser when slots might be shown"""
+        scraper = BerlinAppointmentScraper(session_store=store)
+
+        with patch('berlin_appointment_scraper.requests.Session') as mock_session_class:
+            mock_session_class.return_value.get.return_value.text = '<td class="buchbar">15</td>'
+            with patch.object(scraper, 'check_appointments', return_value=True) as mock_check:
+                result = scraper.run_check()
+
+        assert result is True
+        mock_check.assert_called_once()
+        assert store.load(self.LANDING_URL) is not None
+
+    def test_http_fast_path_expired_session_invalidates(self, store):
+        """Test that a page without message or slots drops the session before Chrome starts"""
+        scraper = BerlinAppointmentScraper(session_store=store)
+
+        with patch('berlin_appointment_scraper.requests.Session') as mock_session_class:
+            mock_session_class.return_value.get.return_value.text = "Ihre Sitzung ist abgelaufen."
+            with patch.object(scraper, 'check_appointments', return_value=False) as mock_check:
+                scraper.run_check()
+
+        mock_check.assert_called_once()
+        assert store.load(self.LANDING_URL) is None
+
+    def test_http_fast_path_not_bookable_calendar_invalidates(self, store):
+        """Test that a calendar with only "nichtbuchbar" days doesn't count as possible slots"""
+        scraper = BerlinAppointmentScraper(session_store=store)
+
+        with patch('berlin_appointment_scraper.requests.Session') as mock_session_class:
+            mock_session_class.return_value.get.return_value.text = '<td class="nichtbuchbar">15</td>'
+            assert scraper.check_saved_session_http() is False
+
+        assert store.load(self.LANDING_URL) is None
+
+    def test_http_fast_path_keeps_hard_ttl(self, store):
+        """Test that a warm check doesn't extend the TTL counted from the form submit"""
+        scraper = BerlinAppointmentScraper(session_store=store)
+        saved_at = store.load(self.LANDING_URL)["saved_at"]
+
+        with patch('berlin_appointment_scraper.requests.Session') as mock_session_class:
+            mock_session_class.return_value.get.return_value.text = self.NO_APPOINTMENTS
+            with patch('session_store.time.time', return_value=saved_at + 300):
+                assert scraper.check_saved_session_http() is True
+
+        assert store.load(self.LANDING_URL)["saved_at"] == saved_at
+
+    def test_slot_markers_match_class_tokens(self):
+        """Test that only the exact "buchbar" class counts as a bookable day"""
+        scraper = BerlinAppointmentScraper()
+        assert scraper._slots_maybe_on_page('<td class="nichtbuchbar">') is False
+        assert scraper._slots_maybe_on_page('<td class="day buchbar">') is True
+        assert scraper._slots_maybe_on_page("<td class='buchbar'>") is True
+        assert scraper._slots_maybe_on_page('<p>buchbar</p>') is False
+
+    def test_session_for_other_service_ignored(self, store):
+        """Test that a scraper doesn't reuse another service's saved session"""
+        scraper = BerlinAppointmentScraper(
+            session_store=store, url="https://service.berlin.de/dienstleistung/120686/"
+        )
+
+        with patch('berlin_appointment_scraper.requests.Session') as mock_session_class:
+            assert scraper.check_saved_session_http() is False
+
+        mock_session_class.assert_not_called()
+
+    def test_http_fast_path_without_session(self, tmp_path):
+        """Test that no request is made when nothing is saved"""
+        store = SessionStore(path=str(tmp_path / "session.json"))
+        scraper = BerlinAppointmentScraper(session_store=store)
+
+        with patch('berlin_appointment_scraper.requests.Session') as mock_session_class:
+            assert scraper.check_saved_session_http() is False
+
+        mock_session_class.assert_not_called()
+
+
 class TestScraperIntegration:
     """Integration tests for the scraper"""
     
@@ -230,7 +454,7 @@ class TestScraperIntegration:
         
         from berlin_appointment_scraper import main
         
-        with patch('builtins.print'):  # Suppress print output
+        with patch('berlin_appointment_scraper.setup_logging'):  # Don't write log files
             main()
             
         mock_scraper_class.assert_called_once()
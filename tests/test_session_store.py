@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the session store
+"""
+
+import json
+import pytest
+import sys
+import os
+import stat
+from unittest.mock import patch
+
+# Add the parent directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from session_store import SessionStore, apply_cookies_to_requests, selenium_to_cdp_cookie
+
+QUERY_URL = "https://service.berlin.de/terminvereinbarung/termin/all/351180/"
+LANDING_URL = "https://service.berlin.de/dienstleistung/351180/"
+COOKIES = [
+    {
+        "name": "Zmsappointment",
+        "value": "abc",
+        "domain": "service.berlin.de",
+        "path": "/",
+        "secure": True,
+        "httpOnly": True,
+        "sameSite": "Lax",
+        "expiry": 1900000000,
+    }
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SessionStore(path=str(tmp_path / "session.json"), ttl=600)
+
+
+class TestSessionStore:
+    """Test saving, loading and invalidating sessions"""
+
+    def test_load_missing(self, store):
+        """Test that nothing is returned before anything was saved"""
+        assert store.load() is None
+
+    def test_save_and_load(self, store):
+        """Test round trip of query URL and cookies"""
+        assert store.save(QUERY_URL, COOKIES) is True
+
+        session = store.load()
+        assert session["query_url"] == QUERY_URL
+        assert session["cookies"] == COOKIES
+
+    def test_saved_file_is_owner_only(self, store):
+        """Test that the cookie file isn't world readable"""
+        store.save(QUERY_URL, COOKIES)
+        mode = stat.S_IMODE(os.stat(store.path).st_mode)
+        assert mode == 0o600
+
+    def test_expired_session(self, store):
+        """Test that sessions older than the TTL are ignored"""
+        with patch("session_store.time.time", return_value=1000.0):
+            store.save(QUERY_URL, COOKIES)
+        with patch("session_store.time.time", return_value=1000.0 + store.ttl):
+            assert store.load() is None
+        with patch("session_store.time.time", return_value=1000.0 + store.ttl - 1):
+            assert store.load() is not None
+
+    def test_landing_url_must_match(self, store):
+        """Test that a session saved for one service isn't used for another"""
+        store.save(QUERY_URL, COOKIES, LANDING_URL)
+
+        assert store.load(LANDING_URL)["landing_url"] == LANDING_URL
+        assert store.load("https://service.berlin.de/dienstleistung/120686/") is None
+
+    def test_invalidate(self, store):
+        """Test that invalidate removes the saved session"""
+        store.save(QUERY_URL, COOKIES)
+        store.invalidate()
+        assert store.load() is None
+        # Invalidating twice is fine
+        store.invalidate()
+
+    def test_corrupt_file(self, store):
+        """Test that a corrupt store is treated as no session"""
+        with open(store.path, "w") as f:
+            f.write("{not json")
+        assert store.load() is None
+
+    def test_missing_query_url(self, store):
+        """Test that a store without query URL is treated as no session"""
+        with open(store.path, "w") as f:
+            json.dump({"cookies": [], "saved_at": 0}, f)
+        assert store.load() is None
+
+    def test_save_unserialisable(self, store):
+        """Test that a failed save doesn't raise or leave files behind"""
+        assert store.save(object(), COOKIES) is False
+        assert os.listdir(os.path.dirname(store.path)) == []
+
+
+class TestCookieConversion:
+    """Test cookie conversion helpers"""
+
+    def test_selenium_to_cdp_cookie(self):
+        """Test conversion to a CDP Network.CookieParam"""
+        param = selenium_to_cdp_cookie(COOKIES[0])
+
+        assert param["name"] == "Zmsappointment"
+        assert param["domain"] == "service.berlin.de"
+        assert param["expires"] == 1900000000
+        assert param["sameSite"] == "Lax"
+        assert "expiry" not in param
+
+    def test_apply_cookies_to_requests(self):
+        """Test loading cookies into a requests session"""
+        http_session = requests.Session()
+        apply_cookies_to_requests(http_session, COOKIES)
+
+        assert http_session.cookies.get("Zmsappointment", domain="service.berlin.de") == "abc"
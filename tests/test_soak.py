@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Tests for the simulated portal and the soak test harness
+"""
+
+import pytest
+import subprocess
+import sys
+import os
+import time
+from unittest.mock import Mock, patch
+
+# Add the parent directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+import run_soak as soak
+from run_soak import (HttpFormScraper, _descendant_processes, _poll_targets, _still_running,
+                      percentiles, run_soak)
+from session_store import SessionStore
+from simulated_portal import NO_APPOINTMENTS_TEXT, SimulatedPortal, random_slot_schedule
+
+
+class TestSimulatedPortal:
+    """Test the simulated portal pages and fault injection"""
+
+    def test_form_flow_reaches_results(self):
+        """Test landing page -> form submit -> results page"""
+        with SimulatedPortal(targets=2) as portal:
+            http_session = requests.Session()
+            landing = http_session.get(portal.landing_url(1), timeout=5)
+            assert 'id="checkbox_overall"' in landing.text
+            assert 'id="appointment_submit"' in landing.text
+
+            results = http_session.post(
+                f"{portal.base_url}/terminvereinbarung/termin/all/1/", timeout=5
+            )
+            assert NO_APPOINTMENTS_TEXT in results.text
+            assert "Zmsappointment" in http_session.cookies
+
+    def test_results_without_session(self):
+        """Test that the results page needs a valid session"""
+        with SimulatedPortal(targets=1) as portal:
+            response = requests.get(f"{portal.base_url}/terminvereinbarung/termin/day/?id=0", timeout=5)
+            assert NO_APPOINTMENTS_TEXT not in response.text
+            assert portal.stats["expired_sessions"] == 1
+
+    def test_slots_on_schedule(self):
+        """Test that slots show up only inside their window"""
+        with SimulatedPortal(targets=1, slot_schedule={0: [(0, 3600)]}) as portal:
+            assert portal.slots_open(0)
+            assert not portal.slots_open(0, at=3600)
+
+            http_session = requests.Session()
+            results = http_session.post(
+                f"{portal.base_url}/terminvereinbarung/termin/all/0/", timeout=5
+            )
+            assert NO_APPOINTMENTS_TEXT not in results.text
+            assert "buchbar" in results.text
+
+    def test_error_injection(self):
+        """Test that error_rate=1 turns every response into a 500"""
+        with SimulatedPortal(targets=1, error_rate=1.0) as portal:
+            response = requests.get(portal.landing_url(0), timeout=5)
+            assert response.status_code == 500
+            assert portal.stats["errors"] == 1
+
+    def test_captcha_injection(self):
+        """Test that captcha_rate=1 serves captcha pages"""
+        with SimulatedPortal(targets=1, captcha_rate=1.0) as portal:
+            response = requests.get(portal.landing_url(0), timeout=5)
+            assert "Roboter" in response.text
+            assert portal.stats["captchas"] == 1
+
+    def test_random_slot_schedule(self):
+        """Test schedule generation"""
+        schedule = random_slot_schedule(10, duration=100, fraction=0.3, window=20)
+        assert len(schedule) == 3
+        for windows in schedule.values():
+            for open_at, close_at in windows:
+                assert 0 <= open_at <= 80
+                assert close_at - open_at == pytest.approx(20)
+
+
+class TestHttpFormScraper:
+    """Test the requests-only scraper used for high target counts"""
+
+    def test_cold_then_warm_check(self, tmp_path):
+        """Test that the first check submits the form and the second reuses the session"""
+        store = SessionStore(str(tmp_path / "session.json"))
+        with SimulatedPortal(targets=1) as portal:
+            scraper = HttpFormScraper(session_store=store, url=portal.landing_url(0))
+
+            assert scraper.run_check() is False
+            assert store.load() is not None
+            assert portal.stats["sessions_created"] == 1
+
+            assert scraper.run_check() is False
+            assert portal.stats["sessions_created"] == 1
+
+    def test_detects_slots(self, tmp_path):
+        """Test that open slots are reported"""
+        store = SessionStore(str(tmp_path / "session.json"))
+        with SimulatedPortal(targets=1, slot_schedule={0: [(0, 3600)]}) as portal:
+            scraper = HttpFormScraper(session_store=store, url=portal.landing_url(0))
+            assert scraper.run_check() is True
+
+    def test_warm_check_detects_slots_opening_later(self, tmp_path):
+        """Test that the saved URL re-runs the query instead of replaying the "taken" page"""
+        store = SessionStore(str(tmp_path / "session.json"))
+        with SimulatedPortal(targets=1, slot_schedule={0: [(0.5, 3600)]}) as portal:
+            scraper = HttpFormScraper(session_store=store, url=portal.landing_url(0))
+            assert scraper.run_check() is False
+            assert "/taken/" not in store.load()["query_url"]
+
+            time.sleep(max(0.0, portal.started_at + 0.6 - time.monotonic()))
+            assert scraper.run_check() is True
+            assert portal.stats["sessions_created"] == 1
+
+
+class TestSoakHarness:
+    """Test the soak harness end to end with a short run"""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles"""
+        summary = percentiles(range(1, 101))
+        assert summary == {"p50": 50, "p90": 90, "p99": 99, "max": 100}
+        assert percentiles([])["p50"] is None
+
+    def test_more_workers_than_targets(self):
+        """Test that run_soak clamps the worker count to the number of targets"""
+        report = run_soak(targets=2, duration=1.0, interval=0.2, workers=4, latency=0.0,
+                          jitter=0.0, error_rate=0.0, slot_fraction=0.0, seed=1)
+
+        assert report["workers"] == 2
+        assert report["checks"] > 0
+
+    def test_poll_targets_with_idle_workers(self):
+        """Test that workers finding an empty schedule wait instead of crashing"""
+        scrapers = [Mock(run_check=Mock(return_value=False)) for _ in range(2)]
+        portal = Mock(started_at=time.monotonic())
+        errors = []
+
+        with patch("threading.excepthook", lambda args: errors.append(args.exc_value)):
+            records = _poll_targets(scrapers, portal, interval=0.1,
+                                    deadline=time.monotonic() + 0.5, workers=4)
+
+        assert errors == []
+        assert len(records) >= 2
+
+    def test_short_run_report(self):
+        """Test that a short run produces a complete report"""
+        report = run_soak(targets=4, duration=2.0, interval=0.25, workers=4, latency=0.0,
+                          jitter=0.0, error_rate=0.0, slot_fraction=0.5, slot_window=1.0, seed=1)
+
+        assert report["checks"] > 0
+        assert report["throughput_per_s"] > 0
+        assert set(report["latency_s"]) == {"p50", "p90", "p99", "max"}
+        assert report["detection"]["slot_windows"] == 2
+        assert report["detection"]["detected"] == 2
+        assert report["detection"]["false_positives"] == 0
+        assert "rss_growth_mb" in report["memory"]
+        assert "exclude Chrome" in report["note"]
+        assert report["orphan_processes"] == []
+
+    @pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="needs /proc")
+    def test_orphans_only_from_this_run(self):
+        """Test that only live processes started by this process are tracked"""
+        child = subprocess.Popen(["sleep", "30"])
+        try:
+            descendants = _descendant_processes(os.getpid())
+            assert descendants[child.pid] == "sleep"
+            assert 1 not in descendants
+            assert _still_running({child.pid: "sleep"}) == {child.pid: "sleep"}
+        finally:
+            child.kill()
+            child.wait()
+        assert _still_running({child.pid: "sleep"}) == {}
+
+    def test_main_keeps_default_levels(self):
+        """Test that the soak levels are merged into the configured ones"""
+        report = {"orphan_processes": []}
+        with patch.object(soak, "setup_logging") as mock_setup, \
+                patch.object(soak, "run_soak", return_value=report):
+            assert soak.main(["--targets", "1"]) == 0
+
+        levels = mock_setup.call_args.kwargs["levels"]
+        assert levels["selenium"] == "WARNING"
+        assert levels["WDM"] == "WARNING"
+        assert levels["berlin_appointment_scraper"] == "WARNING"